@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import sys
+import zipfile
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+_REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(_REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(_REPO_ROOT))
+
+from tools.openfc_pcb_extract import BoardModel, load_board, pad_center  # type: ignore
+
+
+# Columnar board bundle: every column is a standard .npy array, so NumPy consumers can do
+#   b = np.load("board.npz")                       # or np.load("board/pads.net.npy", mmap_mode="r")
+#   pad_net_names = b["nets.name"][b["pads.net"]]
+# Integer columns index either another table's rows or a "dict.*" string dictionary; -1 means none.
+FORMAT_VERSION = 1
+LCSC_FIELDS = ["LCSC Part #", "LCSC Part", "LCSC"]
+
+Column = Union[array, List[str]]
+
+_ENDIAN = "<" if sys.byteorder == "little" else ">"
+_DESCR = {"i": "i4", "q": "i8", "d": "f8"}
+
+
+class _Interner:
+    def __init__(self) -> None:
+        self.index: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def __call__(self, value: str) -> int:
+        idx = self.index.get(value)
+        if idx is None:
+            idx = len(self.values)
+            self.index[value] = idx
+            self.values.append(value)
+        return idx
+
+
+def _npy_header(descr: str, shape: Tuple[int, ...]) -> bytes:
+    header = "{'descr': '%s', 'fortran_order': False, 'shape': (%s), }" % (
+        descr,
+        "".join(f"{n}," for n in shape),
+    )
+    # Magic (6) + version (2) + length (2) + header, padded with spaces to a multiple of 64 bytes.
+    pad = 64 - (10 + len(header) + 1) % 64
+    header = header + " " * pad + "\n"
+    return b"\x93NUMPY\x01\x00" + len(header).to_bytes(2, "little") + header.encode("latin-1")
+
+
+def npy_bytes(column: Column) -> bytes:
+    if isinstance(column, array):
+        descr = _ENDIAN + _DESCR[column.typecode]
+        assert column.itemsize == int(_DESCR[column.typecode][1:])
+        return _npy_header(descr, (len(column),)) + column.tobytes()
+    width = max([1] + [len(s) for s in column])
+    # Fixed-width UTF-32 as NumPy's '<U<n>' dtype expects; shorter strings are NUL-padded.
+    body = b"".join(s.encode("utf-32-le").ljust(width * 4, b"\0") for s in column)
+    return _npy_header(f"<U{width}", (len(column),)) + body
+
+
+def _attr_mask(attrs: Sequence[str], flags: _Interner) -> int:
+    mask = 0
+    for a in attrs:
+        bit = flags(a)
+        if bit >= 31:
+            raise ValueError("too many distinct footprint attrs for an int32 mask")
+        mask |= 1 << bit
+    return mask
+
+
+def build_columns(model: BoardModel) -> Dict[str, Column]:
+    layers = _Interner()
+    values = _Interner()
+    lcsc = _Interner()
+    sheets = _Interner()
+    fp_ids = _Interner()
+    pad_numbers = _Interner()
+    pinfunctions = _Interner()
+    pintypes = _Interner()
+    attr_flags = _Interner()
+    cols: Dict[str, Column] = {"meta.version": array("i", [FORMAT_VERSION])}
+
+    # Nets: row order follows the board's (net <code> "<name>") table.
+    net_row: Dict[str, int] = {}
+    net_code = array("i")
+    net_name: List[str] = []
+    for code, name in model.nets_by_id.items():
+        net_row[code] = len(net_name)
+        net_code.append(int(code))
+        net_name.append(name)
+    cols["nets.code"] = net_code
+    cols["nets.name"] = net_name
+
+    # Definitions: one row per unique library footprint.
+    def_row: Dict[str, int] = {}
+    def_fp_id = array("i")
+    def_layer = array("i")
+    def_pad_count = array("i")
+    for key, d in model.definitions.items():
+        def_row[key] = len(def_fp_id)
+        def_fp_id.append(fp_ids(d.fp_id))
+        def_layer.append(layers(d.layer))
+        def_pad_count.append(len(d.pads))
+    cols["definitions.fp_id"] = def_fp_id
+    cols["definitions.layer"] = def_layer
+    cols["definitions.pad_count"] = def_pad_count
+
+    fp_ref: List[str] = []
+    fp_cols = {name: array("i") for name in ("value", "lcsc", "definition", "layer", "sheet", "attrs")}
+    fp_geo = {name: array("d") for name in ("x", "y", "rotation")}
+    pad_cols = {name: array("i") for name in ("footprint", "number", "net", "pinfunction", "pintype")}
+    pad_geo = {name: array("d") for name in ("x", "y", "width", "height")}
+
+    for row, inst in enumerate(model.instances):
+        fp = inst.to_footprint()
+        fp_ref.append(fp.ref)
+        fp_cols["value"].append(values(fp.value))
+        mpn: Optional[str] = next((fp.properties[k] for k in LCSC_FIELDS if k in fp.properties), None)
+        fp_cols["lcsc"].append(lcsc(mpn) if mpn else -1)
+        fp_cols["definition"].append(def_row[inst.definition.key])
+        fp_cols["layer"].append(layers(fp.layer))
+        fp_cols["sheet"].append(sheets(fp.sheetname) if fp.sheetname else -1)
+        fp_cols["attrs"].append(_attr_mask(fp.attrs, attr_flags))
+        fp_geo["x"].append(fp.at[0])
+        fp_geo["y"].append(fp.at[1])
+        fp_geo["rotation"].append(fp.at[2])
+
+        for pad in fp.pads:
+            x, y = pad_center(fp, pad)
+            pad_cols["footprint"].append(row)
+            pad_cols["number"].append(pad_numbers(pad.number))
+            pad_cols["net"].append(net_row.get(pad.net_id, -1) if pad.net_id and pad.net_name else -1)
+            pad_cols["pinfunction"].append(pinfunctions(pad.pinfunction) if pad.pinfunction else -1)
+            pad_cols["pintype"].append(pintypes(pad.pintype) if pad.pintype else -1)
+            pad_geo["x"].append(x)
+            pad_geo["y"].append(y)
+            pad_geo["width"].append(pad.size[0])
+            pad_geo["height"].append(pad.size[1])
+
+    cols["footprints.ref"] = fp_ref
+    for name, col in {**fp_cols, **fp_geo}.items():
+        cols[f"footprints.{name}"] = col
+    for name, col in {**pad_cols, **pad_geo}.items():
+        cols[f"pads.{name}"] = col
+
+    # Net membership in CSR form: pads of net i are net_pads.index[offsets[i]:offsets[i + 1]].
+    counts = [0] * (len(net_name) + 1)
+    for net in pad_cols["net"]:
+        if net >= 0:
+            counts[net + 1] += 1
+    offsets = array("q", [0] * len(counts))
+    for i in range(1, len(counts)):
+        offsets[i] = offsets[i - 1] + counts[i]
+    fill = offsets[:-1]
+    index = array("i", [0] * offsets[-1])
+    for pad_row, net in enumerate(pad_cols["net"]):
+        if net >= 0:
+            index[fill[net]] = pad_row
+            fill[net] += 1
+    cols["net_pads.offsets"] = offsets
+    cols["net_pads.index"] = index
+
+    for name, interner in (
+        ("layer", layers),
+        ("value", values),
+        ("lcsc", lcsc),
+        ("sheet", sheets),
+        ("fp_id", fp_ids),
+        ("pad_number", pad_numbers),
+        ("pinfunction", pinfunctions),
+        ("pintype", pintypes),
+        ("attr", attr_flags),
+    ):
+        cols[f"dict.{name}"] = interner.values
+    return cols
+
+
+def write_bundle(cols: Dict[str, Column], out: Path) -> None:
+    if out.suffix == ".npz":
+        out.parent.mkdir(parents=True, exist_ok=True)
+        # Stored, not deflated: members stay byte-identical .npy files inside the archive.
+        with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_STORED) as zf:
+            for name, col in cols.items():
+                zf.writestr(f"{name}.npy", npy_bytes(col))
+        return
+    out.mkdir(parents=True, exist_ok=True)
+    for name, col in cols.items():
+        (out / f"{name}.npy").write_bytes(npy_bytes(col))
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Export OpenFC.kicad_pcb as columnar NumPy arrays")
+    ap.add_argument("--pcb", default="OpenFC.kicad_pcb", help="Path to KiCad PCB file")
+    ap.add_argument(
+        "--out",
+        default="analysis/board_export/board.npz",
+        help="Output .npz file, or a directory of .npy files (memory-mappable with np.load(mmap_mode='r'))",
+    )
+    ap.add_argument("--jobs", type=int, default=1, help="Worker processes for tokenizing the board (default: 1)")
+    args = ap.parse_args()
+
+    model = load_board(Path(args.pcb), jobs=args.jobs)
+    write_bundle(build_columns(model), Path(args.out))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -50,6 +50,7 @@ def main() -> int:
         help="Regex for nets to fully expand in Markdown (repeatable). If omitted, uses defaults.",
     )
     ap.add_argument("--max-nodes", type=int, default=30, help="Max nodes to print for a net before truncating")
+    ap.add_argument("--jobs", type=int, default=1, help="Worker processes for tokenizing the board (default: 1)")
     args = ap.parse_args()
 
     outdir = Path(args.outdir)
@@ -74,7 +75,7 @@ def main() -> int:
     ]
     expand_pats = compile_patterns(args.expand if args.expand else default_expand)
 
-    footprints, _nets_by_id = parse_board(Path(args.pcb))
+    footprints, _nets_by_id = parse_board(Path(args.pcb), jobs=args.jobs)
 
     net_nodes: Dict[str, List[Dict[str, str]]] = defaultdict(list)
     for fp in footprints:
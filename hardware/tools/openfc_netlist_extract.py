@@ -6,6 +6,7 @@ import csv
 import json
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, asdict
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Tuple
@@ -86,6 +87,66 @@ def parse_sexpr(tokens: List[Token]) -> Any:
     return expr
 
 
+# Strings (with backslash escapes) are matched whole so parentheses inside them are skipped.
+_PAREN_OR_STRING_RE = re.compile(r'"(?:[^"\\]|\\.)*"|[()]')
+
+
+def toplevel_boundaries(text: str) -> Tuple[int, int, List[int]]:
+    # Returns (root_open, root_close, ends); ends are offsets just past each depth-1 child.
+    depth = 0
+    root_open = -1
+    ends: List[int] = []
+    for m in _PAREN_OR_STRING_RE.finditer(text):
+        tok = m.group()
+        if tok == "(":
+            if depth == 0:
+                if text[: m.start()].strip():
+                    raise ParseError("data before root list")
+                root_open = m.start()
+            depth += 1
+        elif tok == ")":
+            depth -= 1
+            if depth == 1:
+                ends.append(m.end())
+            elif depth == 0:
+                # Same contract as parse_sexpr: only whitespace may follow the root list.
+                if text[m.end() :].strip():
+                    raise ParseError("trailing data after root list")
+                return root_open, m.start(), ends
+            elif depth < 0:
+                raise ParseError("unexpected ')'")
+    raise ParseError("unterminated list")
+
+
+def _parse_span(span: str) -> List[Any]:
+    return parse_sexpr(tokenize_sexpr("(" + span + ")"))
+
+
+def parse_sexpr_parallel(text: str, jobs: int) -> Any:
+    # Tokenize and parse runs of the root's children in worker processes, then stitch them back in order.
+    # The boundary scan and unpickling cost about half a serial parse, so never oversubscribe the CPUs.
+    jobs = min(jobs, os.cpu_count() or 1)
+    if jobs <= 1:
+        return parse_sexpr(tokenize_sexpr(text))
+    root_open, root_close, ends = toplevel_boundaries(text)
+    body_start = root_open + 1
+    # Cut the root body into roughly equal byte ranges, always on a child boundary.
+    target = max(1, (root_close - body_start) // (jobs * 4))
+    spans: List[str] = []
+    start = body_start
+    for end in ends:
+        if end - start >= target:
+            spans.append(text[start:end])
+            start = end
+    spans.append(text[start:root_close])
+
+    root: List[Any] = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for items in pool.map(_parse_span, spans, chunksize=1):
+            root.extend(items)
+    return root
+
+
 def _kv(node: Any) -> Optional[Tuple[str, str]]:
     if isinstance(node, list) and len(node) == 2 and isinstance(node[0], str) and isinstance(node[1], str):
         return node[0], node[1]
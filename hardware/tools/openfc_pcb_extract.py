@@ -3,11 +3,13 @@ from __future__ import annotations
 
 import argparse
 import csv
+import hashlib
 import json
+import math
 import re
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import sys
 
@@ -15,7 +17,7 @@ _REPO_ROOT = Path(__file__).resolve().parent.parent
 if str(_REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(_REPO_ROOT))
 
-from tools.openfc_netlist_extract import ParseError, parse_sexpr, tokenize_sexpr  # type: ignore
+from tools.openfc_netlist_extract import ParseError, parse_sexpr_parallel  # type: ignore
 
 
 @dataclass
@@ -25,6 +27,10 @@ class Pad:
     net_id: Optional[str] = None
     pinfunction: str = ""
     pintype: str = ""
+    # Pad (x, y, angle) relative to the footprint origin; angle is absolute as saved by KiCad.
+    at: Tuple[float, float, float] = (0.0, 0.0, 0.0)
+    size: Tuple[float, float] = (0.0, 0.0)
+    layers: Tuple[str, ...] = ()
 
 
 @dataclass
@@ -34,6 +40,14 @@ class Footprint:
     value: str
     properties: Dict[str, str]
     pads: List[Pad]
+    at: Tuple[float, float, float] = (0.0, 0.0, 0.0)
+    layer: str = ""
+    # (attr smd board_only exclude_from_pos_files exclude_from_bom dnp) -> ("smd", "board_only", ...)
+    attrs: Tuple[str, ...] = ()
+    # Hierarchy: (path "/<sheet uuid>/<symbol uuid>") (sheetname "/LED's1/") (sheetfile "leds.kicad_sch")
+    path: str = ""
+    sheetname: str = ""
+    sheetfile: str = ""
 
 
 def _kv_str(node: Any) -> Optional[tuple[str, str]]:
@@ -53,15 +67,313 @@ def _extract_property(node: Any) -> Optional[tuple[str, str]]:
     return None
 
 
-def parse_board(board_path: Path) -> tuple[List[Footprint], Dict[str, str]]:
+def _at(node: List[Any]) -> Tuple[float, float, float]:
+    # (at 81.72 80.305) or (at 0 1.05 90)
+    vals = [float(v) for v in node[1:4] if isinstance(v, str)]
+    while len(vals) < 3:
+        vals.append(0.0)
+    return vals[0], vals[1], vals[2]
+
+
+# Footprint children that belong to the placed instance rather than the library definition.
+_UUID_KEYS = {"uuid", "tstamp"}
+_INSTANCE_KEYS = _UUID_KEYS | {"at", "property", "path", "sheetname", "sheetfile", "attr", "locked", "net"}
+# Pad children that carry schematic connectivity; everything else in a pad is library geometry.
+_PAD_INSTANCE_KEYS = _UUID_KEYS | {"net", "pinfunction", "pintype"}
+# fp_text kinds that show per-instance fields; user text like "${REFERENCE}" does the same.
+_INSTANCE_TEXT_KINDS = {"reference", "value"}
+_FIELD_TEXT_RE = re.compile(r"^\$\{[^}]*\}$")
+_NUMBER_RE = re.compile(r"^[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?$")
+# Nodes whose numeric children are lengths or coordinates; only these are rounded when hashing, so pad
+# numbers ("1" vs "01") and text stay exact.
+_COORD_KEYS = {
+    "at",
+    "size",
+    "start",
+    "end",
+    "mid",
+    "center",
+    "xy",
+    "width",
+    "thickness",
+    "drill",
+    "offset",
+    "rect_delta",
+    "radius",
+    "roundrect_rratio",
+    "chamfer_ratio",
+}
+
+
+@dataclass(frozen=True)
+class PadDef:
+    number: str
+    # (x, y, angle) relative to the footprint, angle included.
+    at: Tuple[float, float, float]
+    size: Tuple[float, float]
+    layers: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class FootprintDef:
+    key: str
+    fp_id: str
+    layer: str
+    pads: Tuple[PadDef, ...]
+    # Canonical library subtree (nested tuples), shared by every instance with the same key.
+    geometry: Tuple[Any, ...]
+
+
+@dataclass(frozen=True)
+class PadNet:
+    net_id: Optional[str] = None
+    net_name: str = ""
+    pinfunction: str = ""
+    pintype: str = ""
+
+
+@dataclass
+class FootprintInstance:
+    ref: str
+    value: str
+    properties: Dict[str, str]
+    at: Tuple[float, float, float]
+    definition: FootprintDef
+    # Aligned with definition.pads.
+    pad_nets: Tuple[PadNet, ...]
+    # definition.pads index of each pad in file order, so to_footprint() keeps the board's pad order.
+    pad_order: Tuple[int, ...]
+    attrs: Tuple[str, ...] = ()
+    path: str = ""
+    sheetname: str = ""
+    sheetfile: str = ""
+
+    def to_footprint(self) -> Footprint:
+        fa = self.at[2]
+        pads: List[Pad] = []
+        for i in self.pad_order:
+            pd = self.definition.pads[i]
+            pn = self.pad_nets[i]
+            pads.append(
+                Pad(
+                    number=pd.number,
+                    net_name=pn.net_name,
+                    net_id=pn.net_id,
+                    pinfunction=pn.pinfunction,
+                    pintype=pn.pintype,
+                    at=(pd.at[0], pd.at[1], _norm180(pd.at[2] + fa)),
+                    size=pd.size,
+                    layers=pd.layers,
+                )
+            )
+        return Footprint(
+            fp_id=self.definition.fp_id,
+            ref=self.ref,
+            value=self.value,
+            properties=self.properties,
+            pads=pads,
+            at=self.at,
+            layer=self.definition.layer,
+            attrs=self.attrs,
+            path=self.path,
+            sheetname=self.sheetname,
+            sheetfile=self.sheetfile,
+        )
+
+
+@dataclass
+class BoardModel:
+    definitions: Dict[str, FootprintDef]
+    instances: List[FootprintInstance]
+    nets_by_id: Dict[str, str]
+
+
+def _norm180(angle: float) -> float:
+    a = round(angle % 360.0, 6) % 360.0
+    return a - 360.0 if a > 180.0 else a
+
+
+def _canonical_atom(atom: str) -> str:
+    # Rotated copies pick up nanometre rounding noise (0.42 vs 0.419999); compare at 0.1 um.
+    if _NUMBER_RE.match(atom):
+        return repr(round(float(atom), 4) + 0.0)
+    return atom
+
+
+def _is_instance_text(node: List[Any]) -> bool:
+    # (fp_text user "${REFERENCE}" (at 0 -0.68 0) ...)
+    if not (node and node[0] == "fp_text" and len(node) >= 3 and isinstance(node[1], str)):
+        return False
+    return node[1] in _INSTANCE_TEXT_KINDS or (isinstance(node[2], str) and bool(_FIELD_TEXT_RE.match(node[2])))
+
+
+def _canonical(node: Any, fa: float, drop: set[str], upright: bool = False) -> Any:
+    # upright marks the (at ...) of an fp_text, whose angle is compared modulo 180.
+    # KiCad saves nested (at x y angle) with the footprint rotation folded in; undo it so rotated
+    # copies of the same part hash the same.
+    if not isinstance(node, list):
+        return node
+    if node and node[0] == "at" and 3 <= len(node) <= 4 and all(isinstance(v, str) for v in node[1:]):
+        _x, _y, a = _at(node)
+        rel = round(_norm180(a - fa), 4)
+        if upright:
+            # Text is kept readable, so its angle flips by 180 with the placement; only the axis matters.
+            rel %= 180.0
+        return ("at", _canonical_atom(node[1]), _canonical_atom(node[2]), repr(rel + 0.0))
+    numeric = bool(node) and node[0] in _COORD_KEYS
+    is_text = bool(node) and node[0] == "fp_text"
+    out: List[Any] = []
+    for sub in node:
+        if not isinstance(sub, list):
+            out.append(_canonical_atom(sub) if numeric else sub)
+            continue
+        if sub and (sub[0] in drop or _is_instance_text(sub)):
+            continue
+        nested_drop = _PAD_INSTANCE_KEYS if sub and sub[0] == "pad" else _UUID_KEYS
+        out.append(_canonical(sub, fa, nested_drop, is_text))
+    return tuple(out)
+
+
+def _parse_footprint(item: List[Any]) -> Optional[Footprint]:
+    fp_id = item[1] if len(item) > 1 and isinstance(item[1], str) else ""
+    props: Dict[str, str] = {}
+    ref = ""
+    value = ""
+    fp_at = (0.0, 0.0, 0.0)
+    fp_layer = ""
+    fp_attrs: Tuple[str, ...] = ()
+    hier: Dict[str, str] = {}
+    pads: List[Pad] = []
+
+    for sub in item[2:]:
+        prop = _extract_property(sub)
+        if prop:
+            k, v = prop
+            props[k] = v
+            if k == "Reference":
+                ref = v
+            elif k == "Value":
+                value = v
+            continue
+
+        if not (isinstance(sub, list) and sub):
+            continue
+        if sub[0] == "at":
+            fp_at = _at(sub)
+            continue
+        if sub[0] == "layer" and len(sub) >= 2 and isinstance(sub[1], str):
+            fp_layer = sub[1]
+            continue
+        if sub[0] == "attr":
+            fp_attrs = tuple(v for v in sub[1:] if isinstance(v, str))
+            continue
+        if sub[0] in ("path", "sheetname", "sheetfile") and len(sub) >= 2 and isinstance(sub[1], str):
+            hier[sub[0]] = sub[1]
+            continue
+        if sub[0] != "pad":
+            continue
+        # (pad "30" smd rect ... (net 115 "/RP2350A/XIN") (pinfunction "XIN") (pintype "unspecified") ...)
+        pad_number = sub[1] if len(sub) > 1 and isinstance(sub[1], str) else ""
+        pad = Pad(number=pad_number)
+        for psub in sub[2:]:
+            if not (isinstance(psub, list) and psub):
+                continue
+            if psub[0] == "net":
+                # (net 115 "/RP2350A/XIN")
+                if len(psub) >= 3 and isinstance(psub[1], str) and isinstance(psub[2], str):
+                    pad.net_id = psub[1]
+                    pad.net_name = psub[2]
+            elif psub[0] == "pinfunction" and len(psub) >= 2 and isinstance(psub[1], str):
+                pad.pinfunction = psub[1]
+            elif psub[0] == "pintype" and len(psub) >= 2 and isinstance(psub[1], str):
+                pad.pintype = psub[1]
+            elif psub[0] == "at":
+                pad.at = _at(psub)
+            elif psub[0] == "size" and len(psub) >= 3:
+                pad.size = (float(psub[1]), float(psub[2]))
+            elif psub[0] == "layers":
+                pad.layers = tuple(v for v in psub[1:] if isinstance(v, str))
+        pads.append(pad)
+
+    if not ref:
+        return None
+    return Footprint(
+        fp_id=fp_id,
+        ref=ref,
+        value=value,
+        properties=props,
+        pads=pads,
+        at=fp_at,
+        layer=fp_layer,
+        attrs=fp_attrs,
+        path=hier.get("path", ""),
+        sheetname=hier.get("sheetname", ""),
+        sheetfile=hier.get("sheetfile", ""),
+    )
+
+
+def _footprint_instance(item: List[Any], definitions: Dict[str, FootprintDef]) -> Optional[FootprintInstance]:
+    fp = _parse_footprint(item)
+    if fp is None:
+        return None
+    fp_at = fp.at
+    # Aligned with fp.pads: _parse_footprint keeps one Pad per (pad ...) child, in file order.
+    pad_nodes = [sub for sub in item[2:] if isinstance(sub, list) and sub and sub[0] == "pad"]
+
+    # Reference/value fields and their text, position and uuids are instance data; the rest is the library part.
+    # KiCad orders items by uuid when saving, so items are sorted to make the hash order-independent,
+    # and pads (with their nets) are kept in that same canonical order plus a permutation back to file order.
+    canon = _canonical(item, fp_at[2], _INSTANCE_KEYS)
+    geometry = canon[:2] + tuple(sorted(canon[2:], key=repr))
+    pad_keys = [repr(_canonical(node, fp_at[2], _PAD_INSTANCE_KEYS)) for node in pad_nodes]
+    canonical_order = sorted(range(len(fp.pads)), key=lambda i: pad_keys[i])
+    pad_order = [0] * len(fp.pads)
+    for pos, i in enumerate(canonical_order):
+        pad_order[i] = pos
+    pads = [fp.pads[i] for i in canonical_order]
+    key = hashlib.sha1(repr(geometry).encode("utf-8")).hexdigest()
+    definition = definitions.get(key)
+    if definition is None:
+        definition = FootprintDef(
+            key=key,
+            fp_id=fp.fp_id,
+            layer=fp.layer,
+            pads=tuple(
+                PadDef(
+                    number=p.number,
+                    at=(p.at[0], p.at[1], _norm180(p.at[2] - fp_at[2])),
+                    size=p.size,
+                    layers=p.layers,
+                )
+                for p in pads
+            ),
+            geometry=geometry,
+        )
+        definitions[key] = definition
+
+    return FootprintInstance(
+        ref=fp.ref,
+        value=fp.value,
+        properties=fp.properties,
+        at=fp_at,
+        definition=definition,
+        pad_nets=tuple(PadNet(p.net_id, p.net_name, p.pinfunction, p.pintype) for p in pads),
+        pad_order=tuple(pad_order),
+        attrs=fp.attrs,
+        path=fp.path,
+        sheetname=fp.sheetname,
+        sheetfile=fp.sheetfile,
+    )
+
+
+def _board_items(board_path: Path, jobs: int) -> tuple[Dict[str, str], List[List[Any]]]:
     text = board_path.read_text(encoding="utf-8", errors="replace")
-    root = parse_sexpr(tokenize_sexpr(text))
+    root = parse_sexpr_parallel(text, jobs)
     if not isinstance(root, list) or not root or root[0] != "kicad_pcb":
         raise ParseError("expected (kicad_pcb ...)")
 
     nets_by_id: Dict[str, str] = {}
-    footprints: List[Footprint] = []
-
+    footprint_items: List[List[Any]] = []
     for item in root[1:]:
         if not (isinstance(item, list) and item):
             continue
@@ -70,52 +382,36 @@ def parse_board(board_path: Path) -> tuple[List[Footprint], Dict[str, str]]:
             if len(item) >= 3 and isinstance(item[1], str) and isinstance(item[2], str):
                 nets_by_id[item[1]] = item[2]
             continue
+        if item[0] == "footprint":
+            footprint_items.append(item)
+    return nets_by_id, footprint_items
+
+
+def load_board(board_path: Path, jobs: int = 1) -> BoardModel:
+    # Deduplicated view for consumers that work per unique part; hashing every footprint costs
+    # about 45% on top of parse_board, so tools that only need footprints should use that instead.
+    nets_by_id, items = _board_items(board_path, jobs)
+    model = BoardModel(definitions={}, instances=[], nets_by_id=nets_by_id)
+    for item in items:
+        inst = _footprint_instance(item, model.definitions)
+        if inst:
+            model.instances.append(inst)
+    return model
+
+
+def parse_board(board_path: Path, jobs: int = 1) -> tuple[List[Footprint], Dict[str, str]]:
+    # Plain per-footprint path: no canonicalisation or hashing, pads in file order.
+    nets_by_id, items = _board_items(board_path, jobs)
+    footprints = [fp for fp in map(_parse_footprint, items) if fp is not None]
+    return footprints, nets_by_id
 
-        if item[0] != "footprint":
-            continue
-
-        fp_id = item[1] if len(item) > 1 and isinstance(item[1], str) else ""
-        props: Dict[str, str] = {}
-        ref = ""
-        value = ""
-        pads: List[Pad] = []
-
-        for sub in item[2:]:
-            prop = _extract_property(sub)
-            if prop:
-                k, v = prop
-                props[k] = v
-                if k == "Reference":
-                    ref = v
-                elif k == "Value":
-                    value = v
-                continue
-
-            if not (isinstance(sub, list) and sub):
-                continue
-            if sub[0] != "pad":
-                continue
-            # (pad "30" smd rect ... (net 115 "/RP2350A/XIN") (pinfunction "XIN") (pintype "unspecified") ...)
-            pad_number = sub[1] if len(sub) > 1 and isinstance(sub[1], str) else ""
-            pad = Pad(number=pad_number)
-            for psub in sub[2:]:
-                if not (isinstance(psub, list) and psub):
-                    continue
-                if psub[0] == "net":
-                    # (net 115 "/RP2350A/XIN")
-                    if len(psub) >= 3 and isinstance(psub[1], str) and isinstance(psub[2], str):
-                        pad.net_id = psub[1]
-                        pad.net_name = psub[2]
-                elif psub[0] == "pinfunction" and len(psub) >= 2 and isinstance(psub[1], str):
-                    pad.pinfunction = psub[1]
-                elif psub[0] == "pintype" and len(psub) >= 2 and isinstance(psub[1], str):
-                    pad.pintype = psub[1]
-            pads.append(pad)
-
-        if ref:
-            footprints.append(Footprint(fp_id=fp_id, ref=ref, value=value, properties=props, pads=pads))
 
-    return footprints, nets_by_id
+def pad_center(fp: Footprint, pad: Pad) -> Tuple[float, float]:
+    fx, fy, fa = fp.at
+    px, py, _pa = pad.at
+    a = math.radians(fa)
+    # KiCad's y axis points down, so positive angles rotate clockwise in (x, y).
+    return fx + px * math.cos(a) + py * math.sin(a), fy - px * math.sin(a) + py * math.cos(a)
 
 
 def is_ic_ref(ref: str) -> bool:
@@ -126,12 +422,13 @@ def main() -> int:
     ap = argparse.ArgumentParser(description="Extract per-footprint pad connectivity from OpenFC.kicad_pcb")
     ap.add_argument("--pcb", default="OpenFC.kicad_pcb", help="Path to KiCad PCB file")
     ap.add_argument("--outdir", default="analysis/pcb_extract", help="Output directory")
+    ap.add_argument("--jobs", type=int, default=1, help="Worker processes for tokenizing the board (default: 1)")
     args = ap.parse_args()
 
     outdir = Path(args.outdir)
     outdir.mkdir(parents=True, exist_ok=True)
 
-    fps, _nets_by_id = parse_board(Path(args.pcb))
+    fps, _nets_by_id = parse_board(Path(args.pcb), jobs=args.jobs)
 
     # Components table
     with (outdir / "footprints.csv").open("w", newline="", encoding="utf-8") as f:
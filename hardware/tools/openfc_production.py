@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import csv
+import difflib
+import io
+import json
+import math
+import re
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+_REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(_REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(_REPO_ROOT))
+
+from tools.openfc_pcb_extract import Footprint, parse_board  # type: ignore
+
+
+# Output mirrors the Fabrication Toolkit plugin (see fabrication-toolkit-options.json) so generated
+# files can be byte-compared with the revisions checked in under production/.
+BOM_COLUMNS = ["Designator", "Footprint", "Quantity", "Value", "LCSC Part #"]
+POSITION_COLUMNS = ["Designator", "Mid X", "Mid Y", "Rotation", "Layer"]
+MPN_FIELDS = ["LCSC Part #", "LCSC Part", "JLCPCB Part #", "JLCPCB Part", "LCSC", "JLC", "MPN", "Mpn", "mpn"]
+ROTATION_FIELD = "JLCPCB Rotation Offset"
+POSITION_FIELD = "JLCPCB Position Offset"
+# C_0402_1005Metric -> 0402
+PASSIVE_FOOTPRINT_RE = re.compile(r"^(\w*_SMD:)?\w{1,4}_(\d+)_\d+Metric.*$")
+AUX_ORIGIN_RE = re.compile(r"\(aux_axis_origin\s+([-+0-9.eE]+)\s+([-+0-9.eE]+)\s*\)")
+
+Transform = Tuple[re.Pattern[str], float, float, float]
+
+
+def footprint_name(fp: Footprint) -> str:
+    return fp.fp_id.split(":", 1)[1] if ":" in fp.fp_id else fp.fp_id
+
+
+def normalize_footprint_name(name: str) -> str:
+    return PASSIVE_FOOTPRINT_RE.sub(r"\2", name)
+
+
+def get_mpn(fp: Footprint) -> str:
+    for key in MPN_FIELDS:
+        if key in fp.properties:
+            return fp.properties[key]
+    return ""
+
+
+def is_dnp(fp: Footprint) -> bool:
+    return "dnp" in fp.attrs or "dnp" in fp.properties or fp.value.upper() == "DNP"
+
+
+def _offset_field(fp: Footprint, key: str) -> Tuple[float, float]:
+    raw = fp.properties.get(key, "").strip()
+    if not raw:
+        return 0.0, 0.0
+    parts = [p for p in re.split(r"[,;\s]+", raw) if p]
+    vals = [float(p) for p in parts[:2]] + [0.0, 0.0]
+    return vals[0], vals[1]
+
+
+def load_transformations(path: Path) -> List[Transform]:
+    # Rows: footprint regex, rotation offset in degrees, optional X/Y offset in mm.
+    out: List[Transform] = []
+    with path.open(newline="", encoding="utf-8-sig") as f:
+        for row in csv.reader(f):
+            if not row or row[0].startswith("#"):
+                continue
+            try:
+                rotation = float(row[1])
+            except (IndexError, ValueError):
+                continue
+            dx = float(row[2]) if len(row) > 2 and row[2].strip() else 0.0
+            dy = float(row[3]) if len(row) > 3 and row[3].strip() else 0.0
+            out.append((re.compile(row[0]), rotation, dx, dy))
+    return out
+
+
+def _transform_for(name: str, transforms: List[Transform]) -> Tuple[float, float, float]:
+    for pattern, rotation, dx, dy in transforms:
+        if pattern.search(name):
+            return rotation, dx, dy
+    return 0.0, 0.0, 0.0
+
+
+def read_aux_origin(board_path: Path) -> Tuple[int, int]:
+    m = AUX_ORIGIN_RE.search(board_path.read_text(encoding="utf-8", errors="replace"))
+    if not m:
+        return 0, 0
+    return round(float(m.group(1)) * 1_000_000), round(float(m.group(2)) * 1_000_000)
+
+
+def _designator_counts(fps: List[Footprint]) -> Dict[str, int]:
+    counts: Dict[str, int] = defaultdict(int)
+    for fp in fps:
+        counts[fp.ref.upper()] += 1
+    return counts
+
+
+def _next_designator(fp: Footprint, remaining: Dict[str, int]) -> str:
+    # Duplicate references get "_<n>" suffixes counting down; the last one keeps the plain reference.
+    key = fp.ref.upper()
+    if remaining[key] > 1:
+        suffix = remaining[key]
+        remaining[key] -= 1
+        return f"{fp.ref}_{suffix}"
+    return fp.ref
+
+
+def generate(
+    fps: List[Footprint],
+    aux_origin: Tuple[int, int] = (0, 0),
+    transforms: Optional[List[Transform]] = None,
+    exclude_dnp: bool = False,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Dict[str, int]]:
+    transforms = transforms or []
+    fps = sorted(fps, key=lambda fp: fp.ref.upper())
+    designators = _designator_counts(fps)
+    pos_remaining = dict(designators)
+    bom_remaining = dict(designators)
+
+    positions: List[Dict[str, Any]] = []
+    # One pass: rows keyed by (footprint, value, part); dict order keeps first-designator order.
+    bom: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+
+    for fp in fps:
+        name = footprint_name(fp)
+        dnp = is_dnp(fp)
+        skip_dnp = exclude_dnp and dnp
+
+        if "exclude_from_pos_files" not in fp.attrs and not skip_dnp:
+            designator = _next_designator(fp, pos_remaining)
+            layer = "bottom" if fp.layer == "B.Cu" else "top"
+            x, y, rotation = fp.at
+            mid_x = (round(x * 1_000_000) - aux_origin[0]) / 1_000_000.0
+            mid_y = (round(y * 1_000_000) - aux_origin[1]) * -1.0 / 1_000_000.0
+            rot_db, dx_db, dy_db = _transform_for(name, transforms)
+            dx_fp, dy_fp = _offset_field(fp, POSITION_FIELD)
+            dx = dx_fp + dx_db
+            dy = dy_fp + dy_db
+            rsin = math.sin(rotation / 180 * math.pi)
+            rcos = math.cos(rotation / 180 * math.pi)
+            if layer == "bottom":
+                off = (dx * rcos + dy * rsin, dx * rsin - dy * rcos)
+            else:
+                off = (dx * rcos - dy * rsin, dx * rsin + dy * rcos)
+            mid_x += off[0]
+            mid_y += off[1]
+            # Rotation is as seen from above the part, so bottom-side parts are mirrored.
+            if layer == "bottom":
+                rotation = 180.0 - rotation
+            rotation = (rotation + rot_db + _offset_field(fp, ROTATION_FIELD)[0]) % 360.0
+            positions.append(
+                {"Designator": designator, "Mid X": mid_x, "Mid Y": mid_y, "Rotation": rotation, "Layer": layer}
+            )
+
+        if "exclude_from_bom" not in fp.attrs and not skip_dnp:
+            designator = _next_designator(fp, bom_remaining)
+            norm_name = normalize_footprint_name(name)
+            mpn = "DNP" if dnp else get_mpn(fp)
+            key = (norm_name, fp.value.upper(), mpn)
+            row = bom.get(key)
+            if row is None:
+                bom[key] = {
+                    "Designator": designator,
+                    "Footprint": norm_name,
+                    "Quantity": 1,
+                    "Value": fp.value,
+                    "LCSC Part #": mpn,
+                }
+            else:
+                row["Designator"] += ", " + designator
+                row["Quantity"] += 1
+
+    return list(bom.values()), positions, designators
+
+
+def render_csv(rows: List[Dict[str, Any]], columns: List[str]) -> bytes:
+    buf = io.StringIO(newline="")
+    w = csv.DictWriter(buf, fieldnames=columns)
+    w.writeheader()
+    w.writerows(rows)
+    return buf.getvalue().encode("utf-8-sig")
+
+
+def render_designators(designators: Dict[str, int]) -> bytes:
+    return "".join(f"{k}:{v}\n" for k, v in designators.items()).encode("utf-8-sig")
+
+
+def _diff(expected: bytes, actual: bytes, label: str, max_lines: int) -> List[str]:
+    lines = list(
+        difflib.unified_diff(
+            expected.decode("utf-8-sig").splitlines(),
+            actual.decode("utf-8-sig").splitlines(),
+            fromfile=f"{label} (checked in)",
+            tofile=f"{label} (generated)",
+            lineterm="",
+        )
+    )
+    if len(lines) > max_lines:
+        lines = lines[:max_lines] + [f"... {len(lines) - max_lines} more diff lines"]
+    return lines
+
+
+def _load_options(path: Path) -> Dict[str, Any]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Generate JLC BOM and pick-and-place files from OpenFC.kicad_pcb")
+    ap.add_argument("--pcb", default="OpenFC.kicad_pcb", help="Path to KiCad PCB file")
+    ap.add_argument("--outdir", default="analysis/production", help="Output directory")
+    ap.add_argument("--name", default="OpenFC", help="Output file prefix (<name>_bom.csv, ...)")
+    ap.add_argument(
+        "--options",
+        default="fabrication-toolkit-options.json",
+        help="Fabrication Toolkit options file; 'EXCLUDE DNP' is honoured when present",
+    )
+    ap.add_argument("--transformations", help="CSV of footprint regex,rotation[,dx,dy] corrections")
+    ap.add_argument(
+        "--verify",
+        metavar="REVISION",
+        help="Compare against production/<REVISION>_*.csv instead of writing files (exit 1 on mismatch)",
+    )
+    ap.add_argument("--production-dir", default="production", help="Directory holding checked-in revisions")
+    ap.add_argument("--max-diff", type=int, default=40, help="Max diff lines to print per file with --verify")
+    args = ap.parse_args()
+
+    pcb = Path(args.pcb)
+    options = _load_options(Path(args.options))
+    transforms = load_transformations(Path(args.transformations)) if args.transformations else []
+    fps, _nets_by_id = parse_board(pcb)
+    bom, positions, designators = generate(
+        fps,
+        aux_origin=read_aux_origin(pcb),
+        transforms=transforms,
+        exclude_dnp=bool(options.get("EXCLUDE DNP", False)),
+    )
+    outputs = {
+        "bom": render_csv(bom, BOM_COLUMNS),
+        "positions": render_csv(positions, POSITION_COLUMNS),
+        "designators": render_designators(designators),
+    }
+
+    if args.verify:
+        ok = True
+        for kind, data in outputs.items():
+            path = Path(args.production_dir) / f"{args.verify}_{kind}.csv"
+            if not path.exists():
+                print(f"missing: {path}", file=sys.stderr)
+                ok = False
+                continue
+            expected = path.read_bytes()
+            if expected == data:
+                print(f"ok: {path}")
+                continue
+            ok = False
+            print(f"differs: {path}")
+            for line in _diff(expected, data, path.name, args.max_diff):
+                print(line)
+        return 0 if ok else 1
+
+    outdir = Path(args.outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    for kind, data in outputs.items():
+        (outdir / f"{args.name}_{kind}.csv").write_bytes(data)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
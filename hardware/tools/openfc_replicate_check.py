@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import sys
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+_REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(_REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(_REPO_ROOT))
+
+from tools.openfc_pcb_extract import Footprint, parse_board  # type: ignore
+
+
+# A placement relative to the group's anchor footprint: (x, y, angle, flipped).
+RelPlacement = Tuple[float, float, float, bool]
+# Without --anchor only this many candidates are tried, so a drifted group costs O(instances * footprints).
+MAX_ANCHOR_CANDIDATES = 3
+
+
+@dataclass
+class SheetInstance:
+    sheetname: str
+    sheetfile: str
+    # Symbol uuid (last path element) is shared by every instance of the same sheet.
+    by_symbol: Dict[str, Footprint] = field(default_factory=dict)
+
+
+def symbol_uuid(fp: Footprint) -> str:
+    return fp.path.rsplit("/", 1)[-1]
+
+
+def relative_placement(fp: Footprint, anchor: Footprint) -> RelPlacement:
+    ax, ay, aa = anchor.at
+    x, y, a = fp.at
+    dx = x - ax
+    dy = y - ay
+    r = math.radians(aa)
+    # Inverse of KiCad's (y-down) rotation by the anchor angle.
+    lx = dx * math.cos(r) - dy * math.sin(r)
+    ly = dx * math.sin(r) + dy * math.cos(r)
+    return lx, ly, (a - aa) % 360.0, fp.layer != anchor.layer
+
+
+def _quantize(p: RelPlacement, tol: float, angle_tol: float) -> Tuple[int, int, int, bool]:
+    angle = round(p[2] / angle_tol) % round(360.0 / angle_tol)
+    return round(p[0] / tol), round(p[1] / tol), angle, p[3]
+
+
+def placement_digest(placements: Dict[str, RelPlacement], tol: float, angle_tol: float) -> str:
+    h = hashlib.sha1()
+    for sym in sorted(placements):
+        h.update(repr((sym, _quantize(placements[sym], tol, angle_tol))).encode("utf-8"))
+    return h.hexdigest()
+
+
+def group_instances(fps: List[Footprint]) -> Dict[str, List[SheetInstance]]:
+    groups: Dict[str, Dict[str, SheetInstance]] = defaultdict(dict)
+    for fp in fps:
+        if not fp.sheetfile or not fp.path:
+            continue
+        inst = groups[fp.sheetfile].get(fp.sheetname)
+        if inst is None:
+            inst = SheetInstance(sheetname=fp.sheetname, sheetfile=fp.sheetfile)
+            groups[fp.sheetfile][fp.sheetname] = inst
+        inst.by_symbol[symbol_uuid(fp)] = fp
+    return {k: sorted(v.values(), key=lambda i: i.sheetname) for k, v in groups.items() if len(v) > 1}
+
+
+def group_containing(groups: Dict[str, List[SheetInstance]], ref: str) -> Optional[str]:
+    for sheetfile, instances in groups.items():
+        if any(fp.ref == ref for inst in instances for fp in inst.by_symbol.values()):
+            return sheetfile
+    return None
+
+
+def _anchor_candidates(instances: List[SheetInstance], anchor_ref: Optional[str]) -> List[str]:
+    common = set.intersection(*(set(i.by_symbol) for i in instances))
+    if anchor_ref:
+        for inst in instances:
+            for sym, fp in inst.by_symbol.items():
+                if fp.ref == anchor_ref and sym in common:
+                    return [sym]
+        return []
+    # Footprints with more pads (usually the main IC) first; uuid order keeps the result deterministic.
+    first = instances[0]
+    return sorted(common, key=lambda s: (-len(first.by_symbol[s].pads), s))[:MAX_ANCHOR_CANDIDATES]
+
+
+def _drift(a: RelPlacement, b: RelPlacement) -> Tuple[float, float]:
+    dist = math.hypot(a[0] - b[0], a[1] - b[1])
+    dang = abs((a[2] - b[2] + 180.0) % 360.0 - 180.0)
+    return dist, dang
+
+
+def _count_findings(report: Dict[str, Any]) -> int:
+    return sum(len(i["drifted"]) + len(i["missing"]) + len(i["extra"]) for i in report["instances"])
+
+
+def check_group(
+    instances: List[SheetInstance],
+    tol: float,
+    angle_tol: float,
+    anchor_ref: Optional[str] = None,
+) -> Dict[str, Any]:
+    candidates = _anchor_candidates(instances, anchor_ref)
+    if not candidates:
+        return {"sheetfile": instances[0].sheetfile, "error": "no anchor footprint common to all instances"}
+
+    # A drifted anchor would make every other footprint look moved, so without an explicit anchor
+    # try a few candidates (stopping at the first consistent one) and keep the report with the fewest findings.
+    best: Optional[Dict[str, Any]] = None
+    for anchor_sym in candidates:
+        report = _check_with_anchor(instances, anchor_sym, tol, angle_tol, anchor_ref)
+        if best is None or _count_findings(report) < _count_findings(best):
+            best = report
+        if report["consistent"]:
+            break
+    assert best is not None
+    return best
+
+
+def _check_with_anchor(
+    instances: List[SheetInstance],
+    anchor_sym: str,
+    tol: float,
+    angle_tol: float,
+    anchor_ref: Optional[str],
+) -> Dict[str, Any]:
+    # Per-candidate state stays local so the shared SheetInstance objects are never overwritten.
+    anchors: Dict[str, Footprint] = {}
+    placements: Dict[str, Dict[str, RelPlacement]] = {}
+    digests: Dict[str, str] = {}
+    for inst in instances:
+        anchor = inst.by_symbol[anchor_sym]
+        anchors[inst.sheetname] = anchor
+        placements[inst.sheetname] = {sym: relative_placement(fp, anchor) for sym, fp in inst.by_symbol.items()}
+        digests[inst.sheetname] = placement_digest(placements[inst.sheetname], tol, angle_tol)
+
+    # Majority layout is the reference; the instance holding --anchor wins ties.
+    counts = Counter(digests.values())
+
+    def rank(i: SheetInstance) -> Tuple[int, int]:
+        return counts[digests[i.sheetname]], 1 if anchor_ref and anchors[i.sheetname].ref == anchor_ref else 0
+
+    reference = max(instances, key=rank)
+    ref_placements = placements[reference.sheetname]
+
+    report: Dict[str, Any] = {
+        "sheetfile": reference.sheetfile,
+        "reference": reference.sheetname,
+        "anchor": {i.sheetname: anchors[i.sheetname].ref for i in instances},
+        "consistent": True,
+        "instances": [],
+    }
+    for inst in instances:
+        inst_placements = placements[inst.sheetname]
+        entry: Dict[str, Any] = {
+            "sheetname": inst.sheetname,
+            "digest": digests[inst.sheetname][:12],
+            "drifted": [],
+            "missing": [],
+            "extra": [],
+        }
+        if digests[inst.sheetname] != digests[reference.sheetname]:
+            for sym, ref_p in ref_placements.items():
+                p = inst_placements.get(sym)
+                if p is None:
+                    entry["missing"].append(reference.by_symbol[sym].ref)
+                    continue
+                dist, dang = _drift(p, ref_p)
+                if dist > tol or dang > angle_tol or p[3] != ref_p[3]:
+                    entry["drifted"].append(
+                        {
+                            "ref": inst.by_symbol[sym].ref,
+                            "reference_ref": reference.by_symbol[sym].ref,
+                            "offset_mm": round(dist, 4),
+                            "rotation_deg": round(dang, 3),
+                            "side_changed": p[3] != ref_p[3],
+                        }
+                    )
+            entry["extra"] = sorted(inst.by_symbol[s].ref for s in inst_placements if s not in ref_placements)
+            # Digests can differ on a quantization boundary while every footprint is within tolerance.
+            if entry["drifted"] or entry["missing"] or entry["extra"]:
+                report["consistent"] = False
+        report["instances"].append(entry)
+    return report
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Check replicated sheet layouts in OpenFC.kicad_pcb for drift")
+    ap.add_argument("--pcb", default="OpenFC.kicad_pcb", help="Path to KiCad PCB file")
+    ap.add_argument("--sheetfile", action="append", default=[], help="Only check these sheet files (repeatable)")
+    ap.add_argument(
+        "--anchor",
+        help="Anchor footprint reference (e.g. U8, as used by ReplicateLayout); only used for the sheet containing it",
+    )
+    ap.add_argument("--tolerance", type=float, default=0.001, help="Position tolerance in mm (default: 0.001)")
+    ap.add_argument("--angle-tolerance", type=float, default=0.01, help="Rotation tolerance in degrees")
+    ap.add_argument("--json", help="Also write the full report to this JSON file")
+    args = ap.parse_args()
+
+    fps, _nets_by_id = parse_board(Path(args.pcb))
+    groups = group_instances(fps)
+    if args.sheetfile:
+        groups = {k: v for k, v in groups.items() if k in args.sheetfile}
+
+    # --anchor names one footprint, so it only applies to the sheet group that contains it.
+    anchor_group = None
+    if args.anchor:
+        anchor_group = group_containing(groups, args.anchor)
+        if anchor_group is None:
+            ap.error(f"--anchor {args.anchor} is not part of any replicated sheet")
+
+    reports: List[Dict[str, Any]] = []
+    for sheetfile in sorted(groups):
+        anchor = args.anchor if sheetfile == anchor_group else None
+        reports.append(check_group(groups[sheetfile], args.tolerance, args.angle_tolerance, anchor))
+
+    ok = True
+    for rep in reports:
+        if "error" in rep:
+            ok = False
+            print(f"{rep['sheetfile']}: {rep['error']}")
+            continue
+        n = len(rep["instances"])
+        if rep["consistent"]:
+            print(f"{rep['sheetfile']}: {n} instances consistent")
+            continue
+        ok = False
+        print(f"{rep['sheetfile']}: reference {rep['reference']} (anchor {rep['anchor'][rep['reference']]})")
+        for inst in rep["instances"]:
+            if not (inst["drifted"] or inst["missing"] or inst["extra"]):
+                continue
+            print(f"  {inst['sheetname']} (anchor {rep['anchor'][inst['sheetname']]}):")
+            for d in inst["drifted"]:
+                side = ", flipped" if d["side_changed"] else ""
+                print(f"    {d['ref']} vs {d['reference_ref']}: {d['offset_mm']} mm, {d['rotation_deg']} deg{side}")
+            if inst["missing"]:
+                print(f"    missing: {', '.join(inst['missing'])}")
+            if inst["extra"]:
+                print(f"    extra: {', '.join(inst['extra'])}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(reports, indent=2, sort_keys=True), encoding="utf-8")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
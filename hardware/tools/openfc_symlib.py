@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import re
+import sys
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+_REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(_REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(_REPO_ROOT))
+
+from tools.openfc_netlist_extract import (  # type: ignore
+    ParseError,
+    _find_sections,
+    parse_components,
+    parse_sexpr,
+    tokenize_sexpr,
+    toplevel_boundaries,
+)
+from tools.openfc_pcb_extract import Footprint, parse_board  # type: ignore
+
+
+INDEX_VERSION = 2
+SYMBOL_HEAD_RE = re.compile(r'\s*(?P<open>\()symbol\s+"(?P<name>(?:[^"\\]|\\.)*)"')
+EXTENDS_RE = re.compile(r'\(extends\s+"((?:[^"\\]|\\.)*)"\s*\)')
+UNESCAPE_RE = re.compile(r"\\(.)")
+
+
+@dataclass
+class LibPin:
+    number: str
+    name: str
+    electrical_type: str
+    unit: int = 0
+
+
+@dataclass
+class LibSymbol:
+    name: str
+    extends: str = ""
+    properties: Dict[str, str] = field(default_factory=dict)
+    pins: List[LibPin] = field(default_factory=list)
+
+    def pin_table(self) -> Dict[str, LibPin]:
+        # Multi-unit symbols may repeat shared pins (e.g. power) per unit; the first one wins.
+        table: Dict[str, LibPin] = {}
+        for pin in self.pins:
+            table.setdefault(pin.number, pin)
+        return table
+
+
+def _unescape(s: str) -> str:
+    return UNESCAPE_RE.sub(r"\1", s)
+
+
+def _symbol_name(raw: str) -> str:
+    # Names are sliced from the latin-1 view of the file; recover the UTF-8 text before unescaping.
+    return _unescape(raw.encode("latin-1").decode("utf-8", errors="replace"))
+
+
+def build_index(lib_path: Path) -> Dict[str, Tuple[int, int, str]]:
+    # latin-1 maps bytes 1:1 onto characters, so string offsets are file byte offsets.
+    text = lib_path.read_bytes().decode("latin-1")
+    root_open, _root_close, ends = toplevel_boundaries(text)
+    index: Dict[str, Tuple[int, int, str]] = {}
+    start = root_open + 1
+    for end in ends:
+        m = SYMBOL_HEAD_RE.match(text, start, end)
+        if m:
+            ext = EXTENDS_RE.search(text, m.end(), end)
+            index[_symbol_name(m.group("name"))] = (m.start("open"), end, _symbol_name(ext.group(1)) if ext else "")
+        start = end
+    return index
+
+
+def _parse_pin(node: List[Any], unit: int) -> Optional[LibPin]:
+    # (pin unspecified line (at ..) (length ..) (name "IN" ...) (number "1" ...))
+    etype = node[1] if len(node) > 1 and isinstance(node[1], str) else ""
+    name = ""
+    number = ""
+    for sub in node[2:]:
+        if isinstance(sub, list) and len(sub) >= 2 and isinstance(sub[1], str):
+            if sub[0] == "name":
+                name = sub[1]
+            elif sub[0] == "number":
+                number = sub[1]
+    if not number:
+        return None
+    return LibPin(number=number, name=name, electrical_type=etype, unit=unit)
+
+
+def parse_symbol(node: Any) -> LibSymbol:
+    if not (isinstance(node, list) and len(node) >= 2 and node[0] == "symbol" and isinstance(node[1], str)):
+        raise ParseError("expected (symbol \"name\" ...)")
+    sym = LibSymbol(name=node[1])
+    for sub in node[2:]:
+        if not (isinstance(sub, list) and sub):
+            continue
+        if sub[0] == "property" and len(sub) >= 3 and isinstance(sub[1], str) and isinstance(sub[2], str):
+            sym.properties[sub[1]] = sub[2]
+        elif sub[0] == "extends" and len(sub) >= 2 and isinstance(sub[1], str):
+            sym.extends = sub[1]
+        elif sub[0] == "symbol" and len(sub) >= 2 and isinstance(sub[1], str):
+            # Unit sub-symbols are named "<name>_<unit>_<body style>"; unit 0 is shared by all units.
+            parts = sub[1].rsplit("_", 2)
+            unit = int(parts[1]) if len(parts) == 3 and parts[1].isdigit() else 0
+            for gsub in sub[2:]:
+                if isinstance(gsub, list) and gsub and gsub[0] == "pin":
+                    pin = _parse_pin(gsub, unit)
+                    if pin:
+                        sym.pins.append(pin)
+    return sym
+
+
+class SymbolLibrary:
+    def __init__(self, lib_path: Path, index_path: Optional[Path] = None, cache_size: int = 64) -> None:
+        self.lib_path = lib_path
+        self.index_path = index_path or lib_path.with_name(lib_path.name + ".index.json")
+        self._index: Optional[Dict[str, Tuple[int, int, str]]] = None
+        self._load = lru_cache(maxsize=cache_size)(self._load_uncached)
+
+    def _stamp(self) -> Dict[str, int]:
+        st = self.lib_path.stat()
+        return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+    @property
+    def index(self) -> Dict[str, Tuple[int, int, str]]:
+        if self._index is None:
+            stamp = self._stamp()
+            try:
+                cached = json.loads(self.index_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                cached = None
+            if cached and cached.get("version") == INDEX_VERSION and cached.get("source") == stamp:
+                self._index = {k: (v[0], v[1], v[2]) for k, v in cached["symbols"].items()}
+            else:
+                self._index = build_index(self.lib_path)
+                payload = {"version": INDEX_VERSION, "source": stamp, "symbols": self._index}
+                try:
+                    self.index_path.write_text(json.dumps(payload, sort_keys=True), encoding="utf-8")
+                except OSError:
+                    pass
+        return self._index
+
+    def names(self) -> List[str]:
+        return sorted(self.index.keys())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index
+
+    def _read_raw(self, name: str) -> LibSymbol:
+        start, end, _extends = self.index[name]
+        with self.lib_path.open("rb") as f:
+            f.seek(start)
+            chunk = f.read(end - start).decode("utf-8", errors="replace")
+        return parse_symbol(parse_sexpr(tokenize_sexpr(chunk)))
+
+    def _load_uncached(self, name: str) -> LibSymbol:
+        sym = self._read_raw(name)
+        seen = {name}
+        # Derived symbols take pins from the root of their extends chain and override properties.
+        parent_name = sym.extends
+        while parent_name:
+            if parent_name in seen or parent_name not in self.index:
+                raise ParseError(f"bad extends chain for symbol {name!r} at {parent_name!r}")
+            seen.add(parent_name)
+            parent = self._read_raw(parent_name)
+            sym.properties = {**parent.properties, **sym.properties}
+            if not sym.pins:
+                sym.pins = parent.pins
+            parent_name = parent.extends
+        return sym
+
+    def get(self, name: str) -> LibSymbol:
+        if name not in self.index:
+            raise KeyError(name)
+        return self._load(name)
+
+    def pin_table(self, name: str) -> Dict[str, LibPin]:
+        return self.get(name).pin_table()
+
+
+def load_symbol_refs(netlist_path: Path, lib_nickname: str) -> Dict[str, str]:
+    text = netlist_path.read_text(encoding="utf-8", errors="replace")
+    sections = _find_sections(parse_sexpr(tokenize_sexpr(text)))
+    components_section = sections.get("components")
+    if components_section is None:
+        raise ParseError("missing components section")
+    return {ref: c.part for ref, c in parse_components(components_section).items() if c.lib == lib_nickname}
+
+
+def enrich_pads(footprints: List[Footprint], lib: SymbolLibrary, symbol_by_ref: Dict[str, str]) -> List[Dict[str, str]]:
+    # Fill empty pinfunction/pintype on pads from the library and report every pad that was compared.
+    # Rows carry the board's values from before filling, so missing pin data shows up as a mismatch.
+    rows: List[Dict[str, str]] = []
+    for fp in footprints:
+        sym_name = symbol_by_ref.get(fp.ref, "")
+        if not sym_name or sym_name not in lib:
+            continue
+        table = lib.pin_table(sym_name)
+        for pad in fp.pads:
+            pin = table.get(pad.number)
+            if pin is None:
+                continue
+            board = (pad.pinfunction, pad.pintype)
+            filled = not pad.pinfunction or not pad.pintype
+            if not pad.pinfunction:
+                pad.pinfunction = pin.name
+            if not pad.pintype:
+                pad.pintype = pin.electrical_type
+            rows.append(
+                {
+                    "ref": fp.ref,
+                    "symbol": sym_name,
+                    "pad": pad.number,
+                    "pinfunction": board[0],
+                    "pintype": board[1],
+                    "lib_name": pin.name,
+                    "lib_type": pin.electrical_type,
+                    "match": "yes" if board == (pin.name, pin.electrical_type) else "no",
+                    "filled": "yes" if filled else "no",
+                }
+            )
+    return rows
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Look up pin tables in lib.kicad_sym without parsing the whole library")
+    ap.add_argument("--lib", default="lib.kicad_sym", help="Path to KiCad symbol library")
+    ap.add_argument("--nickname", default="lib", help="Library nickname used in the netlist/sym-lib-table")
+    ap.add_argument("--symbol", action="append", default=[], help="Symbol to dump (repeatable)")
+    ap.add_argument("--pcb", help="Compare pad pinfunction/pintype of this PCB against the library")
+    ap.add_argument("--netlist", default="OpenFC.net", help="Netlist used to map references to symbols")
+    ap.add_argument("--outdir", default="analysis/symlib", help="Output directory")
+    args = ap.parse_args()
+
+    lib = SymbolLibrary(Path(args.lib))
+    outdir = Path(args.outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+
+    if args.symbol:
+        dump = {name: asdict(lib.get(name)) for name in args.symbol}
+        (outdir / "symbols.json").write_text(json.dumps(dump, indent=2, sort_keys=True), encoding="utf-8")
+
+    if args.pcb:
+        footprints, _nets_by_id = parse_board(Path(args.pcb))
+        rows = enrich_pads(footprints, lib, load_symbol_refs(Path(args.netlist), args.nickname))
+        rows.sort(key=lambda r: (r["ref"], r["pad"]))
+        with (outdir / "pad_pins.csv").open("w", newline="", encoding="utf-8") as f:
+            cols = ["ref", "symbol", "pad", "pinfunction", "pintype", "lib_name", "lib_type", "match", "filled"]
+            w = csv.DictWriter(f, fieldnames=cols)
+            w.writeheader()
+            w.writerows(rows)
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import math
+import re
+import sys
+from array import array
+from collections import defaultdict
+from dataclasses import dataclass, field
+from operator import mul
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+_REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(_REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(_REPO_ROOT))
+
+from tools.openfc_netlist_extract import ParseError, parse_sexpr, tokenize_sexpr  # type: ignore
+from tools.openfc_pcb_extract import Footprint, Pad, pad_center, parse_board  # type: ignore
+
+
+# KiCad writes every top-level item starting with "\n\t(" and closes it with "\n\t)"; strings never
+# contain raw newlines, so zone blocks can be sliced out without tokenizing the rest of the board.
+ZONE_START_RE = re.compile(r"^\t\(zone\b", re.MULTILINE)
+TOPLEVEL_END = "\n\t)"
+# (pts (xy 1 2) (xy 3 4) (arc (start ..) (mid ..) (end ..)))
+PTS_RE = re.compile(r"\(pts((?:\s*\((?:[^()]|\([^()]*\))*\))*)\s*\)")
+XY_NUM_RE = re.compile(r"\(xy\s+([-+0-9.eE]+)\s+([-+0-9.eE]+)\s*\)")
+
+
+@dataclass
+class ZonePolygon:
+    layer: str
+    xs: array
+    ys: array
+
+    @property
+    def area(self) -> float:
+        return polygon_area(self.xs, self.ys)
+
+    def bbox(self) -> Tuple[float, float, float, float]:
+        if not self.xs:
+            return (0.0, 0.0, 0.0, 0.0)
+        return min(self.xs), min(self.ys), max(self.xs), max(self.ys)
+
+
+@dataclass
+class Zone:
+    uuid: str
+    name: str = ""
+    net_id: str = ""
+    net_name: str = ""
+    layers: List[str] = field(default_factory=list)
+    priority: int = 0
+    keepout: bool = False
+    outline: List[ZonePolygon] = field(default_factory=list)
+    filled: List[ZonePolygon] = field(default_factory=list)
+
+    def filled_area_by_layer(self) -> Dict[str, float]:
+        out: Dict[str, float] = {layer: 0.0 for layer in self.layers}
+        for poly in self.filled:
+            out[poly.layer] = out.get(poly.layer, 0.0) + poly.area
+        return out
+
+
+def polygon_area(xs: array, ys: array) -> float:
+    # Shoelace over whole coordinate arrays. KiCad stores filled areas "fractured" (holes joined to
+    # the outline by zero-width bridges) with holes wound the other way, so the absolute value is the
+    # net copper area: the outline minus its holes (a 10x10 fill with a 2x2 hole gives 96).
+    if len(xs) < 3:
+        return 0.0
+    ys_next = ys[1:] + ys[:1]
+    xs_next = xs[1:] + xs[:1]
+    return abs(math.fsum(map(mul, xs, ys_next)) - math.fsum(map(mul, xs_next, ys))) / 2.0
+
+
+def clip_polygon(xs: array, ys: array, clip: List[Tuple[float, float]]) -> Tuple[array, array]:
+    # Sutherland-Hodgman against a convex, positively oriented clip polygon (as built by pad_polygon).
+    # The subject may be concave or fractured; the signed area of the result stays exact.
+    out_x = xs
+    out_y = ys
+    n = len(clip)
+    for i in range(n):
+        if not out_x:
+            break
+        ax, ay = clip[i]
+        bx, by = clip[(i + 1) % n]
+        ex = bx - ax
+        ey = by - ay
+        in_x = out_x
+        in_y = out_y
+        out_x = array("d")
+        out_y = array("d")
+        m = len(in_x)
+        px = in_x[m - 1]
+        py = in_y[m - 1]
+        p_in = ex * (py - ay) - ey * (px - ax) >= 0.0
+        for j in range(m):
+            cx = in_x[j]
+            cy = in_y[j]
+            c_in = ex * (cy - ay) - ey * (cx - ax) >= 0.0
+            if c_in != p_in:
+                dx = cx - px
+                dy = cy - py
+                denom = ex * dy - ey * dx
+                if denom != 0.0:
+                    t = (ey * (px - ax) - ex * (py - ay)) / denom
+                    out_x.append(px + t * dx)
+                    out_y.append(py + t * dy)
+            if c_in:
+                out_x.append(cx)
+                out_y.append(cy)
+            px, py, p_in = cx, cy, c_in
+    return out_x, out_y
+
+
+def _parse_pts(body: str) -> Tuple[array, array]:
+    flat = array("d", map(float, [v for pair in XY_NUM_RE.findall(body) for v in pair]))
+    return flat[0::2], flat[1::2]
+
+
+def iter_zone_blocks(text: str) -> Iterator[str]:
+    for m in ZONE_START_RE.finditer(text):
+        end = text.find(TOPLEVEL_END, m.end())
+        if end < 0:
+            raise ParseError("unterminated zone block")
+        yield text[m.start() : end + len(TOPLEVEL_END)]
+
+
+def parse_zone_block(block: str) -> Zone:
+    # Point lists go straight into float arrays; only the small remainder goes through the tree parser.
+    pts: List[Tuple[array, array]] = []
+
+    def stash(m: re.Match[str]) -> str:
+        pts.append(_parse_pts(m.group(1)))
+        return f"(pts {len(pts) - 1})"
+
+    node = parse_sexpr(tokenize_sexpr(PTS_RE.sub(stash, block)))
+    if not (isinstance(node, list) and node and node[0] == "zone"):
+        raise ParseError("expected (zone ...)")
+
+    zone = Zone(uuid="")
+    for sub in node[1:]:
+        if not (isinstance(sub, list) and sub):
+            continue
+        key = sub[0]
+        if key == "net" and len(sub) >= 2 and isinstance(sub[1], str):
+            zone.net_id = sub[1]
+        elif key == "net_name" and len(sub) >= 2 and isinstance(sub[1], str):
+            zone.net_name = sub[1]
+        elif key == "layer" and len(sub) >= 2 and isinstance(sub[1], str):
+            zone.layers = [sub[1]]
+        elif key == "layers":
+            zone.layers = [v for v in sub[1:] if isinstance(v, str)]
+        elif key == "uuid" and len(sub) >= 2 and isinstance(sub[1], str):
+            zone.uuid = sub[1]
+        elif key == "name" and len(sub) >= 2 and isinstance(sub[1], str):
+            zone.name = sub[1]
+        elif key == "priority" and len(sub) >= 2 and isinstance(sub[1], str):
+            zone.priority = int(sub[1])
+        elif key == "keepout":
+            zone.keepout = True
+        elif key in ("polygon", "filled_polygon"):
+            layer = ""
+            idx: Optional[int] = None
+            for psub in sub[1:]:
+                if not (isinstance(psub, list) and len(psub) >= 2):
+                    continue
+                if psub[0] == "layer" and isinstance(psub[1], str):
+                    layer = psub[1]
+                elif psub[0] == "pts":
+                    idx = int(psub[1])
+            if idx is None:
+                continue
+            xs, ys = pts[idx]
+            if key == "polygon":
+                zone.outline.append(ZonePolygon(layer=layer, xs=xs, ys=ys))
+            else:
+                zone.filled.append(ZonePolygon(layer=layer, xs=xs, ys=ys))
+    return zone
+
+
+def parse_zones(board_path: Path) -> List[Zone]:
+    text = board_path.read_text(encoding="utf-8", errors="replace")
+    return [parse_zone_block(block) for block in iter_zone_blocks(text)]
+
+
+def _layer_matches(pad_layers: Tuple[str, ...], layer: str) -> bool:
+    if layer in pad_layers:
+        return True
+    return layer.endswith(".Cu") and "*.Cu" in pad_layers
+
+
+def pad_polygon(fp: Footprint, pad: Pad) -> List[Tuple[float, float]]:
+    # Pads are treated as their bounding rectangle (exact for rect, conservative for round shapes).
+    cx, cy = pad_center(fp, pad)
+    hw = pad.size[0] / 2.0
+    hh = pad.size[1] / 2.0
+    b = math.radians(pad.at[2])
+    cos_b = math.cos(b)
+    sin_b = math.sin(b)
+    corners = [(-hw, -hh), (hw, -hh), (hw, hh), (-hw, hh)]
+    return [(cx + x * cos_b + y * sin_b, cy - x * sin_b + y * cos_b) for x, y in corners]
+
+
+def zone_pad_overlaps(zones: List[Zone], footprints: List[Footprint]) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    pads_by_net: Dict[str, List[Tuple[Footprint, Pad]]] = defaultdict(list)
+    for fp in footprints:
+        for pad in fp.pads:
+            if pad.net_name and pad.size[0] > 0 and pad.size[1] > 0:
+                pads_by_net[pad.net_name].append((fp, pad))
+
+    for zone in zones:
+        if zone.keepout or not zone.net_name:
+            continue
+        # Without a fill, fall back to the outline on each of the zone's layers.
+        polys = zone.filled or [
+            ZonePolygon(layer=layer, xs=o.xs, ys=o.ys) for o in zone.outline for layer in zone.layers
+        ]
+        boxes = [p.bbox() for p in polys]
+        for fp, pad in pads_by_net.get(zone.net_name, []):
+            quad = pad_polygon(fp, pad)
+            qx0 = min(x for x, _ in quad)
+            qy0 = min(y for _, y in quad)
+            qx1 = max(x for x, _ in quad)
+            qy1 = max(y for _, y in quad)
+            pad_area = pad.size[0] * pad.size[1]
+            per_layer: Dict[str, float] = {}
+            for poly, (bx0, by0, bx1, by1) in zip(polys, boxes):
+                if not _layer_matches(pad.layers, poly.layer):
+                    continue
+                if qx1 < bx0 or qx0 > bx1 or qy1 < by0 or qy0 > by1:
+                    continue
+                cx, cy = clip_polygon(poly.xs, poly.ys, quad)
+                per_layer[poly.layer] = per_layer.get(poly.layer, 0.0) + polygon_area(cx, cy)
+            for layer, overlap in sorted(per_layer.items()):
+                if overlap <= 0.0:
+                    continue
+                rows.append(
+                    {
+                        "zone": zone.uuid,
+                        "net": zone.net_name,
+                        "layer": layer,
+                        "ref": fp.ref,
+                        "pad": pad.number,
+                        "pad_area": round(pad_area, 6),
+                        "overlap_area": round(min(overlap, pad_area), 6),
+                        "overlap_ratio": round(min(overlap / pad_area, 1.0), 4),
+                    }
+                )
+    return rows
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Extract copper zones and fill statistics from OpenFC.kicad_pcb")
+    ap.add_argument("--pcb", default="OpenFC.kicad_pcb", help="Path to KiCad PCB file")
+    ap.add_argument("--outdir", default="analysis/zone_extract", help="Output directory")
+    ap.add_argument("--no-pads", action="store_true", help="Skip zone-to-pad overlap (avoids parsing footprints)")
+    args = ap.parse_args()
+
+    outdir = Path(args.outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+
+    pcb = Path(args.pcb)
+    zones = parse_zones(pcb)
+
+    # Per-zone summary
+    zone_rows: List[Dict[str, Any]] = []
+    for z in zones:
+        filled = z.filled_area_by_layer()
+        zone_rows.append(
+            {
+                "uuid": z.uuid,
+                "name": z.name,
+                "net": z.net_name,
+                "layers": z.layers,
+                "priority": z.priority,
+                "keepout": z.keepout,
+                "outline_area": round(sum(p.area for p in z.outline), 6),
+                "outline_points": sum(len(p.xs) for p in z.outline),
+                "filled_points": sum(len(p.xs) for p in z.filled),
+                "filled_area": {k: round(v, 6) for k, v in sorted(filled.items())},
+            }
+        )
+    (outdir / "zones.json").write_text(json.dumps(zone_rows, indent=2, sort_keys=True), encoding="utf-8")
+
+    # Copper area per net and layer (filled polygons only; unfilled zones contribute nothing)
+    net_copper: Dict[str, Dict[str, float]] = defaultdict(dict)
+    for z in zones:
+        if z.keepout or not z.net_name:
+            continue
+        for layer, area in z.filled_area_by_layer().items():
+            net_copper[z.net_name][layer] = round(net_copper[z.net_name].get(layer, 0.0) + area, 6)
+    (outdir / "net_copper.json").write_text(json.dumps(net_copper, indent=2, sort_keys=True), encoding="utf-8")
+
+    if not args.no_pads:
+        footprints, _nets_by_id = parse_board(pcb)
+        rows = zone_pad_overlaps(zones, footprints)
+        rows.sort(key=lambda r: (r["net"], r["layer"], r["ref"], r["pad"]))
+        with (outdir / "zone_pads.csv").open("w", newline="", encoding="utf-8") as f:
+            cols = ["zone", "net", "layer", "ref", "pad", "pad_area", "overlap_area", "overlap_ratio"]
+            w = csv.DictWriter(f, fieldnames=cols)
+            w.writeheader()
+            w.writerows(rows)
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())